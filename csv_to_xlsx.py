@@ -7,14 +7,20 @@ Multi-Line-Feldern) und erzeugt je eine XLSX-Datei mit:
 """
 
 import argparse
+import codecs
 import csv
 import glob
+import functools
+import hashlib
+import itertools
 import os
+import re
 import subprocess
+import tempfile
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+import xlsxwriter
 
 GRADES_COLUMN = "BewerbungenZusatzfragenBeantworteteFragenPflicht"
 GROUP_COLUMN = "Schüler:in Bildungsangebot Vollqualifizierter Schlüssel"
@@ -46,6 +52,21 @@ BEWERTUNG_WERTE = {
     "entspricht nicht den Erwartungen": 50,
 }
 
+# Kopfzeilen-Stil der XLSX; wird einmal pro Workbook als Format angelegt
+# und von allen Kopfzellen gemeinsam genutzt
+HEADER_FORMAT = {
+    "bold": True,
+    "bg_color": "#D9E1F2",
+    "bottom": 1,
+    "align": "center",
+}
+
+# Obergrenze für automatisch ermittelte Spaltenbreiten in der XLSX
+MAX_COLUMN_WIDTH = 60
+
+# Dezimalzahlen in Antworten erkennen (Punkt oder Komma)
+FLOAT_RE = re.compile(r"-?[0-9]+[.,][0-9]+")
+
 
 def parse_answers(field_content):
     """Zerlegt ein mehrzeiliges Feld 'Schlüssel: Wert' in eine Liste von Tupeln.
@@ -58,13 +79,17 @@ def parse_answers(field_content):
     if not field_content or not field_content.strip():
         return []
 
+    # Modulkonstanten als Locals für die Schleife
+    bew_key = BEWERTUNG_KEY
+    bew_rename = BEWERTUNG_RENAME
+    bew_werte = BEWERTUNG_WERTE
+
     results = []
     seen = {}
     for line in field_content.split("\n"):
-        line = line.strip()
-        if not line or ": " not in line:
+        key, sep, value = line.strip().partition(": ")
+        if not sep:
             continue
-        key, value = line.split(": ", 1)
         key = key.strip()
         value = value.strip()
 
@@ -72,9 +97,9 @@ def parse_answers(field_content):
         seen[key] = count
 
         # "Bitte geben Sie die Bewertung..." → AV / SV + Zahlenwert
-        if key == BEWERTUNG_KEY:
-            col_name = BEWERTUNG_RENAME.get(count, f"Bewertung ({count})")
-            value = BEWERTUNG_WERTE.get(value, value)
+        if key == bew_key:
+            col_name = bew_rename.get(count) or f"Bewertung ({count})"
+            value = bew_werte.get(value, value)
         else:
             col_name = key if count == 1 else f"{key} ({count})"
 
@@ -83,113 +108,217 @@ def parse_answers(field_content):
     return results
 
 
-def read_csv(csv_path):
-    """Liest eine Semikolon-CSV mit quoted Multi-Line-Feldern."""
-    encodings = ["utf-8-sig", "utf-8", "latin-1"]
-    for enc in encodings:
-        try:
-            with open(csv_path, "r", encoding=enc) as f:
-                reader = csv.DictReader(f, delimiter=";", quotechar='"')
-                records = list(reader)
-            return records
-        except (UnicodeDecodeError, UnicodeError):
-            continue
-    raise RuntimeError(f"Konnte {csv_path} mit keinem Encoding lesen.")
+def coerce_number(value):
+    """Wandelt numerische Antworten in int/float um, alles andere bleibt."""
+    if not isinstance(value, str) or not value:
+        return value
+    # Ganze Zahlen (häufigster Fall) per str.isdigit, ohne Regex
+    digits = value[1:] if value[0] == "-" else value
+    if digits.isdigit() and digits.isascii():
+        return int(value)
+    if ("." in value or "," in value) and FLOAT_RE.fullmatch(value):
+        return float(value.replace(",", "."))
+    return value
+
+
+def detect_encoding(csv_path, sample_size=65536):
+    """Bestimmt das Encoding anhand einer Stichprobe vom Dateianfang."""
+    with open(csv_path, "rb") as f:
+        head = f.read(sample_size)
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # Inkrementell dekodieren: ein am Ende abgeschnittenes Zeichen ist kein Fehler
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+    except UnicodeDecodeError:
+        return "latin-1"
+    return "utf-8"
 
 
-def write_xlsx(records, xlsx_path, is_fg=False):
+def read_csv(csv_path):
+    """Liest eine Semikolon-CSV mit quoted Multi-Line-Feldern.
+
+    Die Zeilen werden beim Lesen direkt nach Bildungsgang gruppiert, ohne
+    zusätzliche Gesamtliste. Gibt (header, groups, total) zurück: header
+    bildet Spaltenname → Index ab, groups Bildungsgang → Liste von Zeilen
+    (Listen von Strings), total ist die Anzahl der Datensätze.
+    """
+    enc = detect_encoding(csv_path)
+    try:
+        return read_csv_groups(csv_path, enc)
+    except UnicodeDecodeError:
+        # Ungültiges UTF-8 erst hinter der Stichprobe
+        return read_csv_groups(csv_path, "latin-1")
+
+
+def read_csv_groups(csv_path, encoding):
+    """Liest Header und Zeilen einer CSV im angegebenen Encoding, gruppiert."""
+    with open(csv_path, "r", encoding=encoding, newline="") as f:
+        reader = csv.reader(f, delimiter=";", quotechar='"')
+        fieldnames = next(reader, [])
+        header = {name: idx for idx, name in enumerate(fieldnames)}
+        n_fields = len(fieldnames)
+        group_idx = header.get(GROUP_COLUMN)
+        groups = defaultdict(list)
+        total = 0
+        for row in reader:
+            if not row:
+                continue
+            # Zu kurze Zeilen auffüllen, damit jeder Index gültig ist
+            if len(row) < n_fields:
+                row += [""] * (n_fields - len(row))
+            group_key = row[group_idx].strip() if group_idx is not None else ""
+            groups[group_key or "unbekannt"].append(row)
+            total += 1
+    return header, groups, total
+
+
+def get_field(rec, header, column):
+    """Liefert den Wert einer Spalte ("" falls die Spalte fehlt)."""
+    idx = header.get(column)
+    return rec[idx] if idx is not None else ""
+
+
+def set_column_widths(ws, widths):
+    """Setzt Spaltenbreiten; benachbarte gleich breite Spalten in einem Aufruf."""
+    first = 0
+    for width, run in itertools.groupby(widths):
+        last = first + len(list(run)) - 1
+        ws.set_column(first, last, width)
+        first = last + 1
+
+
+def write_xlsx(records, header, xlsx_path, is_fg=False):
     """Schreibt eine Liste von Datensätzen als XLSX."""
     # Basis-Felder ggf. um Schulgliederung erweitern
     base_fields = list(BASE_FIELDS)
     if is_fg:
         base_fields.insert(4, FG_EXTRA_FIELD)
 
+    # Antworten je Datensatz einmal zerlegen
+    grades_idx = header.get(GRADES_COLUMN)
+    parsed = [parse_answers(rec[grades_idx]) for rec in records]
+
     # Noten-Spalten aus allen Datensätzen dieser Gruppe sammeln
-    all_answer_cols = []
-    for rec in records:
-        answers = parse_answers(rec.get(GRADES_COLUMN, ""))
+    # (dict als geordnete Menge statt linearer Suche in einer Liste)
+    seen_cols = {}
+    for answers in parsed:
         for col_name, _ in answers:
-            if col_name not in all_answer_cols:
-                all_answer_cols.append(col_name)
+            seen_cols[col_name] = None
+    all_answer_cols = list(seen_cols)
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Bewerber"
+    # constant_memory: Zeilen werden direkt in die Ausgabedatei gestreamt
+    wb = xlsxwriter.Workbook(
+        xlsx_path, {"constant_memory": True, "strings_to_urls": False}
+    )
+    ws = wb.add_worksheet("Bewerber")
 
     # Header
     header_labels = [label for _, label in base_fields] + all_answer_cols
-    header_font = Font(bold=True)
-    header_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-    thin_border = Border(bottom=Side(style="thin"))
-
-    for col_idx, label in enumerate(header_labels, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=label)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.border = thin_border
-        cell.alignment = Alignment(horizontal="center")
-
-    # Datenzeilen
-    for row_idx, rec in enumerate(records, start=2):
-        for col_idx, (csv_col, _) in enumerate(base_fields, start=1):
-            value = rec.get(csv_col, "")
-            transform = FIELD_TRANSFORMS.get(csv_col)
+    header_fmt = wb.add_format(HEADER_FORMAT)
+
+    ws.write_row(0, 0, header_labels, header_fmt)
+
+    # Spaltenbreiten: längster Eintrag je Spalte, beim Schreiben mitgeführt
+    widths = [max(len(str(label)), 8) for label in header_labels]
+
+    # Datenzeilen (Spaltenindex und Transformation je Spalte einmal nachschlagen)
+    base_cols = [
+        (header.get(csv_col), FIELD_TRANSFORMS.get(csv_col)) for csv_col, _ in base_fields
+    ]
+    for row_idx, (rec, answers) in enumerate(zip(records, parsed), start=1):
+        base_vals = []
+        for idx, transform in base_cols:
+            value = rec[idx] if idx is not None else ""
             if transform:
                 value = transform(value)
-            ws.cell(row=row_idx, column=col_idx, value=value)
+            base_vals.append(value)
 
-        answers = parse_answers(rec.get(GRADES_COLUMN, ""))
         answer_dict = dict(answers)
 
-        for col_idx, col_name in enumerate(all_answer_cols, start=len(base_fields) + 1):
-            value = answer_dict.get(col_name, "")
-            try:
-                value = int(value)
-            except (ValueError, TypeError):
-                try:
-                    value = float(value)
-                except (ValueError, TypeError):
-                    pass
-            ws.cell(row=row_idx, column=col_idx, value=value)
-
-    # Spaltenbreiten
-    for col_idx, label in enumerate(header_labels, start=1):
-        width = max(len(str(label)), 8) + 2
-        ws.column_dimensions[ws.cell(row=1, column=col_idx).column_letter].width = width
-
-    ws.auto_filter.ref = ws.dimensions
-    wb.save(xlsx_path)
+        answer_vals = [
+            coerce_number(answer_dict.get(col_name, "")) for col_name in all_answer_cols
+        ]
+
+        row = base_vals + answer_vals
+        for col_idx, value in enumerate(row):
+            length = len(str(value))
+            if length > widths[col_idx]:
+                widths[col_idx] = length
+        ws.write_row(row_idx, 0, row)
+
+    set_column_widths(ws, [min(width + 2, MAX_COLUMN_WIDTH) for width in widths])
+    ws.autofilter(0, 0, len(records), len(header_labels) - 1)
+    wb.close()
     return len(all_answer_cols)
 
 
+# LaTeX-Sonderzeichen, in einem Durchlauf per str.translate ersetzt
+LATEX_ESCAPES = str.maketrans({
+    "\\": r"\textbackslash{}",
+    "&": r"\&", "%": r"\%", "$": r"\$", "#": r"\#",
+    "_": r"\_", "{": r"\{", "}": r"\}",
+    "~": r"\textasciitilde{}", "^": r"\textasciicircum{}",
+})
+
+
 def escape_latex(text):
     """Sonderzeichen für LaTeX escapen."""
     if not text:
         return ""
-    text = str(text)
-    text = text.replace("\\", r"\textbackslash{}")
-    for char, repl in [
-        ("&", r"\&"), ("%", r"\%"), ("$", r"\$"), ("#", r"\#"),
-        ("_", r"\_"), ("{", r"\{"), ("}", r"\}"),
-        ("~", r"\textasciitilde{}"), ("^", r"\textasciicircum{}"),
-    ]:
-        text = text.replace(char, repl)
-    return text
-
-
-def write_latex_pdf(records, pdf_path, bildungsgang, verbose=False, is_fg=False):
-    """Erzeugt eine LaTeX-Übersichtstabelle als PDF (A4 Querformat)."""
+    return str(text).translate(LATEX_ESCAPES)
+
+
+# Präambel der Bildungsgang-PDFs; wird pro Lauf einmal als Format vorkompiliert
+LATEX_PREAMBLE = r"""\documentclass[a4paper,landscape,10pt]{article}
+\usepackage[left=1.5cm,right=1.5cm,top=2cm,bottom=1.5cm]{geometry}
+\usepackage[utf8]{inputenc}
+\usepackage[T1]{fontenc}
+\usepackage[default]{sourcesanspro}
+\usepackage[ngerman]{babel}
+\usepackage{xltabular}
+\usepackage{array}
+\usepackage{fancyhdr}
+"""
+PREAMBLE_FORMAT = "bewerber-praeambel"
+
+# Dateiname (ohne Endung) des Sammel-PDFs bei --kombiniert
+COMBINED_PDF_NAME = "bildungsgaenge"
+
+# Hinweis, wenn pdflatex fehlt (wird von den Aufrufern von compile_latex ausgegeben)
+PDFLATEX_MISSING = "    WARNUNG: pdflatex nicht gefunden – nur .tex erzeugt."
+
+# Tabellenzeile im PDF; FG-Gruppen haben zusätzlich die Spalte Schulgliederung
+LATEX_ROW = "    {col1} & {col2} & {col3} & & \\\\\n    \\hline"
+LATEX_ROW_FG = "    {col1} & {col2} & {col3} & {col_sg} & & \\\\\n    \\hline"
+
+
+def priority_rank(value):
+    """Prioritätsrang als Zahl; leere oder nicht-numerische Angaben zuletzt."""
+    value = value.strip()
+    if value.isascii() and value.isdigit():
+        return int(value)
+    return 999
+
+
+def build_tex_body(records, header, bildungsgang, is_fg=False):
+    """Erzeugt den Dokumentteil eines Bildungsgangs (Kopfzeile + Tabelle).
+
+    Jeder Teil beginnt mit Seite 1 und endet mit einem Seitenumbruch, so dass
+    mehrere Teile in einem Dokument hintereinander stehen können.
+    """
 
     def g(rec, field):
-        return escape_latex(rec.get(field, "").strip())
+        return escape_latex(get_field(rec, header, field).strip())
 
     # Sortierung: Rang (numerisch), dann Name, Vorname
     records = sorted(records, key=lambda r: (
-        int(r.get("Schüler:in Bewerbung Prioritaetsrang", "") or 999),
-        r.get("Schüler:in Name", "").lower(),
-        r.get("Schüler:in Vorname", "").lower(),
+        priority_rank(get_field(r, header, "Schüler:in Bewerbung Prioritaetsrang")),
+        get_field(r, header, "Schüler:in Name").lower(),
+        get_field(r, header, "Schüler:in Vorname").lower(),
     ))
 
+    row_template = LATEX_ROW_FG if is_fg else LATEX_ROW
     rows = []
     for rec in records:
         # Spalte 1: Name/Adresse
@@ -210,18 +339,18 @@ def write_latex_pdf(records, pdf_path, bildungsgang, verbose=False, is_fg=False)
         ] if p)
 
         # Spalte 3: Qualifikation / Status
-        hoechst = rec.get(
-            "Schüler:in Qualifikation höchster Schulabschluss Kürzel", ""
+        hoechst = get_field(
+            rec, header, "Schüler:in Qualifikation höchster Schulabschluss Kürzel"
         ).strip()
-        letzt = rec.get(
-            "Schüler:in Qualifikation letzter Schulabschluss Kürzel", ""
+        letzt = get_field(
+            rec, header, "Schüler:in Qualifikation letzter Schulabschluss Kürzel"
         ).strip()
         quali = escape_latex(hoechst if hoechst else letzt)
 
         rang = g(rec, "Schüler:in Bewerbung Prioritaetsrang")
         unterlagen = g(rec, "Schüler:in Bewerbung Unterlagen vollständig eingereicht")
-        foerder = rec.get(
-            "Schüler:in Sonderpädagogischer Förderbedarf", ""
+        foerder = get_field(
+            rec, header, "Schüler:in Sonderpädagogischer Förderbedarf"
         ).strip()
 
         col3_parts = []
@@ -236,14 +365,15 @@ def write_latex_pdf(records, pdf_path, bildungsgang, verbose=False, is_fg=False)
             col3_parts.append(r"Förd.\,X")
         col3 = r" \newline ".join(col3_parts)
 
+        fields = {"col1": col1, "col2": col2, "col3": col3}
         if is_fg:
-            col_sg = g(rec, "Schüler:in abgebende Schule Schulgliederung")
-            rows.append(f"    {col1} & {col2} & {col3} & {col_sg} & & \\\\\n    \\hline")
-        else:
-            rows.append(f"    {col1} & {col2} & {col3} & & \\\\\n    \\hline")
+            fields["col_sg"] = g(rec, "Schüler:in abgebende Schule Schulgliederung")
+        rows.append(row_template.format_map(fields))
 
     bg_esc = escape_latex(bildungsgang)
-    bg_bez = escape_latex(records[0].get("Schüler:in Bildungsgang Bezeichnung", "").strip())
+    bg_bez = escape_latex(
+        get_field(records[0], header, "Schüler:in Bildungsgang Bezeichnung").strip()
+    )
     rows_tex = "\n".join(rows)
 
     if is_fg:
@@ -264,28 +394,8 @@ def write_latex_pdf(records, pdf_path, bildungsgang, verbose=False, is_fg=False)
             r"\textbf{Bemerkungen} \\"
         )
 
-    tex = rf"""\documentclass[a4paper,landscape,10pt]{{article}}
-\usepackage[left=1.5cm,right=1.5cm,top=2cm,bottom=1.5cm]{{geometry}}
-\usepackage[utf8]{{inputenc}}
-\usepackage[T1]{{fontenc}}
-\usepackage[default]{{sourcesanspro}}
-\usepackage[ngerman]{{babel}}
-\usepackage{{xltabular}}
-\usepackage{{array}}
-\usepackage{{fancyhdr}}
-
-\pagestyle{{fancy}}
-\fancyhf{{}}
-\fancyhead[C]{{\large\bfseries {bg_esc} -- {bg_bez}}}
-\fancyfoot[C]{{\thepage}}
-\renewcommand{{\headrulewidth}}{{0.4pt}}
-\setlength{{\parindent}}{{0pt}}
-\renewcommand{{\arraystretch}}{{1.2}}
-
-\begin{{document}}
-
-\newcolumntype{{L}}[1]{{>{{\raggedright\arraybackslash}}p{{#1}}}}
-\newcolumntype{{R}}{{>{{\raggedright\arraybackslash}}X}}
+    return rf"""\fancyhead[C]{{\large\bfseries {bg_esc} -- {bg_bez}}}
+\setcounter{{page}}{{1}}
 
 \begin{{xltabular}}{{\textwidth}}{{{col_spec}}}
 \hline
@@ -300,7 +410,30 @@ def write_latex_pdf(records, pdf_path, bildungsgang, verbose=False, is_fg=False)
 \endfoot
 {rows_tex}
 \end{{xltabular}}
+\clearpage
+"""
+
 
+def write_tex_document(bodies, pdf_path, verbose=False, fmt=None):
+    """Setzt Dokumentteile (build_tex_body) zu einem PDF im A4-Querformat zusammen."""
+    bodies_tex = "\n".join(bodies)
+
+    tex = rf"""\providecommand{{\endofdump}}{{}}
+{LATEX_PREAMBLE}\endofdump
+
+\pagestyle{{fancy}}
+\fancyhf{{}}
+\fancyfoot[C]{{\thepage}}
+\renewcommand{{\headrulewidth}}{{0.4pt}}
+\setlength{{\parindent}}{{0pt}}
+\renewcommand{{\arraystretch}}{{1.2}}
+
+\newcolumntype{{L}}[1]{{>{{\raggedright\arraybackslash}}p{{#1}}}}
+\newcolumntype{{R}}{{>{{\raggedright\arraybackslash}}X}}
+
+\begin{{document}}
+
+{bodies_tex}
 \end{{document}}
 """
 
@@ -308,30 +441,101 @@ def write_latex_pdf(records, pdf_path, bildungsgang, verbose=False, is_fg=False)
     with open(tex_path, "w", encoding="utf-8") as f:
         f.write(tex)
 
-    return compile_latex(tex_path, verbose)
+    return compile_latex(tex_path, verbose, fmt=fmt)
+
+
+def write_latex_pdf(records, header, pdf_path, bildungsgang, verbose=False, is_fg=False,
+                    fmt=None):
+    """Erzeugt eine LaTeX-Übersichtstabelle als PDF (A4 Querformat)."""
+    body = build_tex_body(records, header, bildungsgang, is_fg=is_fg)
+    return write_tex_document([body], pdf_path, verbose, fmt=fmt)
+
+
+@functools.lru_cache(maxsize=None)
+def build_preamble_format(work_dir):
+    """Kompiliert LATEX_PREAMBLE einmalig zu einem pdflatex-Format.
+
+    Dokumente, die mit dem Format übersetzt werden, überspringen ihre
+    Präambel bis \\endofdump und laden die Pakete nicht erneut.
+    Gibt den Pfad der .fmt-Datei zurück, oder None falls das nicht klappt.
+    Das Ergebnis wird pro work_dir zwischengespeichert, das Format also erst
+    beim ersten Bedarf und höchstens einmal gebaut.
+    """
+    ini_path = os.path.join(work_dir, f"{PREAMBLE_FORMAT}.tex")
+    with open(ini_path, "w", encoding="utf-8") as f:
+        f.write(LATEX_PREAMBLE)
+        # Im fertigen Format überspringt \documentclass alles bis \endofdump
+        f.write("\\long\\def\\documentclass#1\\endofdump{}\n")
+        f.write("\\def\\endofdump{}\n")
+        f.write("\\dump\n")
+
+    try:
+        subprocess.run(
+            ["pdflatex", "-ini", "-interaction=batchmode",
+             f"-jobname={PREAMBLE_FORMAT}", "-output-directory", work_dir,
+             "&pdflatex", ini_path],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=60,
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return None
+
+    fmt_path = os.path.join(work_dir, f"{PREAMBLE_FORMAT}.fmt")
+    return fmt_path if os.path.exists(fmt_path) else None
+
+
+def log_requests_rerun(log_path):
+    """True, wenn das pdflatex-Log einen weiteren Lauf anfordert."""
+    try:
+        with open(log_path, "rb") as f:
+            return b"Rerun" in f.read()
+    except OSError:
+        return False
 
 
-def compile_latex(tex_path, verbose=False):
-    """Kompiliert eine .tex-Datei zu PDF. Gibt True zurück bei Erfolg."""
+def compile_latex(tex_path, verbose=False, fmt=None):
+    """Kompiliert eine .tex-Datei zu PDF. Gibt True zurück, wenn dabei ein
+    neues PDF entstanden ist.
+
+    Mit fmt (Pfad einer .fmt-Datei) wird das vorkompilierte Format verwendet.
+    Fehlt pdflatex, wird None zurückgegeben; die Warnung (PDFLATEX_MISSING)
+    gibt der Aufrufer aus, damit sie bei parallelen Workern an der richtigen
+    Stelle erscheint.
+    """
     out_dir = os.path.dirname(tex_path) or "."
     base = os.path.splitext(tex_path)[0]
     pdf_path = base + ".pdf"
     log_path = base + ".log"
 
+    cmd = ["pdflatex", "-interaction=batchmode", "-output-directory", out_dir]
+    env = None
+    if fmt:
+        fmt_dir, fmt_file = os.path.split(fmt)
+        cmd.append(f"-fmt={os.path.splitext(fmt_file)[0]}")
+        # Ein leerer Eintrag (abschließender Trenner) steht für den Standard-Suchpfad
+        env = dict(os.environ)
+        env["TEXFORMATS"] = fmt_dir + os.pathsep + env.get("TEXFORMATS", "")
+    cmd.append(tex_path)
+
+    # Altes .log (z.B. von einem früheren -v-Lauf) darf die Rerun-Prüfung nicht
+    # täuschen, ein altes PDF nicht als Erfolg gelten (und so einen Stempel bekommen)
+    for path in (log_path, pdf_path):
+        if os.path.exists(path):
+            os.remove(path)
+
     try:
-        with open(log_path, "w", encoding="utf-8") as logf:
+        # pdflatex schreibt sein .log selbst; die Terminalausgabe wird nur mit
+        # verbose aufgehoben (Fehler, bevor das .log angelegt ist), sonst verworfen
+        with (open(base + ".stdout", "wb") if verbose else open(os.devnull, "wb")) as out:
+            # Keine Querverweise: ein Lauf genügt, außer LaTeX fordert
+            # einen zweiten an (z.B. "Table widths have changed. Rerun LaTeX.")
             for _ in range(2):
-                result = subprocess.run(
-                    ["pdflatex", "-interaction=nonstopmode",
-                     "-output-directory", out_dir, tex_path],
-                    capture_output=True, text=True, timeout=30,
+                subprocess.run(
+                    cmd, stdout=out, stderr=subprocess.STDOUT, timeout=30, env=env,
                 )
-                logf.write(result.stdout)
-                if result.stderr:
-                    logf.write(result.stderr)
+                if not log_requests_rerun(log_path):
+                    break
     except FileNotFoundError:
-        print("    WARNUNG: pdflatex nicht gefunden – nur .tex erzeugt.")
-        return False
+        return None
 
     # Hilfsdateien aufräumen
     for ext in (".aux", ".out"):
@@ -340,7 +544,7 @@ def compile_latex(tex_path, verbose=False):
             os.remove(aux)
 
     if not verbose:
-        for ext in (".tex", ".log"):
+        for ext in (".tex", ".log", ".stdout"):
             path = base + ext
             if os.path.exists(path):
                 os.remove(path)
@@ -396,49 +600,155 @@ def write_summary_pdf(stats, pdf_path, verbose=False):
     return compile_latex(tex_path, verbose)
 
 
-def process_csv(csv_path, verbose=False):
-    """Verarbeitet eine CSV: gruppiert nach Bildungsgang, sortiert nach Name."""
-    records = read_csv(csv_path)
-    if not records:
+def file_fingerprint(csv_path):
+    """Prüfsumme über CSV-Inhalt und dieses Skript (Schlüssel für den Ausgabe-Cache)."""
+    h = hashlib.blake2b(digest_size=16)
+    for path in (os.path.abspath(__file__), csv_path):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def is_current(out_path, fingerprint, force=False):
+    """True, wenn out_path existiert und mit diesem Fingerprint erzeugt wurde.
+
+    Mit force gilt keine Datei als aktuell; der Stempel wird beim Neuerzeugen
+    trotzdem geschrieben, damit ein alter Stempel nicht stehen bleibt.
+    """
+    if force or not fingerprint or not os.path.exists(out_path):
+        return False
+    try:
+        with open(out_path + ".stamp", "r", encoding="ascii") as f:
+            return f.read().strip() == fingerprint
+    except OSError:
+        return False
+
+
+def pdf_is_current(pdf_path, fingerprint, verbose=False, force=False):
+    """Wie is_current für PDFs; mit verbose wird immer neu kompiliert,
+    damit .tex und .log entstehen."""
+    return not verbose and is_current(pdf_path, fingerprint, force)
+
+
+def write_stamp(out_path, fingerprint):
+    """Vermerkt den Fingerprint neben der erzeugten Datei (<Datei>.stamp)."""
+    if fingerprint:
+        with open(out_path + ".stamp", "w", encoding="ascii") as f:
+            f.write(fingerprint + "\n")
+
+
+def group_file_name(bildungsgang):
+    """Dateiname (ohne Endung) eines Bildungsgangs: Slash → Dash."""
+    return bildungsgang.replace("/", "-")
+
+
+def process_group(job):
+    """Erzeugt XLSX und PDF für einen Bildungsgang (läuft im Worker-Prozess).
+
+    Gibt (Dateiname ohne Endung, Anzahl Noten-Spalten, PDF vorhanden,
+    PDF unverändert, Tex-Teil) zurück; Anzahl Noten-Spalten ist None, wenn die
+    XLSX unverändert aus dem Cache stammt. pdf_mode "einzeln" kompiliert ein
+    eigenes PDF, "sammel" liefert nur den Tex-Teil für das gemeinsame Dokument,
+    None überspringt den PDF-Teil (Sammel-PDF ist bereits aktuell).
+    """
+    (bildungsgang, group_records, header, out_dir, verbose, fmt, pdf_mode,
+     fingerprint, force) = job
+
+    # Nach Name, Vorname sortieren
+    group_records.sort(key=lambda r: (
+        get_field(r, header, "Schüler:in Name").lower(),
+        get_field(r, header, "Schüler:in Vorname").lower(),
+    ))
+
+    is_fg = bildungsgang.startswith("FG")
+
+    safe_name = group_file_name(bildungsgang)
+    xlsx_path = os.path.join(out_dir, f"{safe_name}.xlsx")
+    if is_current(xlsx_path, fingerprint, force):
+        n_cols = None
+    else:
+        n_cols = write_xlsx(group_records, header, xlsx_path, is_fg=is_fg)
+        write_stamp(xlsx_path, fingerprint)
+
+    # LaTeX-PDF-Übersicht
+    if pdf_mode is None:
+        return safe_name, n_cols, False, False, None
+    if pdf_mode == "sammel":
+        body = build_tex_body(group_records, header, bildungsgang, is_fg=is_fg)
+        return safe_name, n_cols, False, False, body
+
+    pdf_path = os.path.join(out_dir, f"{safe_name}.pdf")
+    if pdf_is_current(pdf_path, fingerprint, verbose, force):
+        return safe_name, n_cols, True, True, None
+
+    pdf_ok = write_latex_pdf(group_records, header, pdf_path, bildungsgang, verbose,
+                             is_fg=is_fg, fmt=fmt)
+    if pdf_ok:
+        write_stamp(pdf_path, fingerprint)
+
+    return safe_name, n_cols, pdf_ok, False, None
+
+
+def process_csv(csv_path, verbose=False, executor=None, work_dir=None, bodies=None,
+                fingerprint=None, pdf_mode="einzeln", force=False):
+    """Verarbeitet eine CSV: gruppiert nach Bildungsgang, sortiert nach Name.
+
+    Die Bildungsgänge sind unabhängig voneinander und werden, falls ein
+    Executor übergeben wird, parallel verarbeitet. Mit pdf_mode "sammel"
+    werden statt Einzel-PDFs die Tex-Teile an bodies angehängt, mit None
+    entfällt der PDF-Teil ganz (siehe process_group).
+    Mit fingerprint (file_fingerprint) werden unveränderte Dateien übersprungen,
+    außer bei force.
+    Mit work_dir wird das Präambel-Format dort gebaut, sobald mindestens ein
+    Einzel-PDF tatsächlich kompiliert werden muss.
+    """
+    header, groups, total = read_csv(csv_path)
+    if not total:
         print(f"  Keine Datensätze in {csv_path} — übersprungen.")
         return []
 
-    if GRADES_COLUMN not in records[0]:
+    if GRADES_COLUMN not in header:
         print(f"  Spalte '{GRADES_COLUMN}' nicht gefunden in {csv_path} — übersprungen.")
         return []
 
-    # Nach Bildungsgang gruppieren
-    groups = defaultdict(list)
-    for rec in records:
-        group_key = rec.get(GROUP_COLUMN, "").strip() or "unbekannt"
-        groups[group_key].append(rec)
-
     out_dir = os.path.dirname(csv_path)
     stats = []
 
-    for bildungsgang, group_records in sorted(groups.items()):
-        # Nach Name, Vorname sortieren
-        group_records.sort(key=lambda r: (
-            r.get("Schüler:in Name", "").lower(),
-            r.get("Schüler:in Vorname", "").lower(),
-        ))
-
-        is_fg = bildungsgang.startswith("FG")
-
-        # Dateiname: Slash → Dash
-        safe_name = bildungsgang.replace("/", "-")
-        xlsx_path = os.path.join(out_dir, f"{safe_name}.xlsx")
-        n_cols = write_xlsx(group_records, xlsx_path, is_fg=is_fg)
-        print(f"  -> {safe_name}.xlsx  ({len(group_records)} Bewerber, {n_cols} Noten-Spalten)")
-
-        # LaTeX-PDF-Übersicht
-        pdf_path = os.path.join(out_dir, f"{safe_name}.pdf")
-        if write_latex_pdf(group_records, pdf_path, bildungsgang, verbose, is_fg=is_fg):
+    fmt = None
+    if work_dir and pdf_mode == "einzeln" and any(
+        not pdf_is_current(
+            os.path.join(out_dir, f"{group_file_name(bg)}.pdf"), fingerprint, verbose, force
+        )
+        for bg in groups
+    ):
+        fmt = build_preamble_format(work_dir)
+
+    jobs = [
+        (bg, recs, header, out_dir, verbose, fmt, pdf_mode, fingerprint, force)
+        for bg, recs in sorted(groups.items())
+    ]
+    results = executor.map(process_group, jobs) if executor else map(process_group, jobs)
+
+    # Ausgabe in fester Reihenfolge, unabhängig davon, welcher Worker zuerst fertig ist
+    for (bildungsgang, group_records, *_), result in zip(jobs, results):
+        safe_name, n_cols, pdf_ok, pdf_cached, body = result
+        if n_cols is None:
+            print(f"  -> {safe_name}.xlsx  ({len(group_records)} Bewerber, unverändert)")
+        else:
+            print(f"  -> {safe_name}.xlsx  ({len(group_records)} Bewerber, {n_cols} Noten-Spalten)")
+        if pdf_cached:
+            print(f"  -> {safe_name}.pdf  (unverändert)")
+        elif pdf_ok:
             print(f"  -> {safe_name}.pdf")
+        elif pdf_ok is None:
+            print(PDFLATEX_MISSING)
+        if pdf_mode == "sammel":
+            bodies.append(body)
 
         stats.append((bildungsgang, len(group_records)))
 
-    print(f"  Gesamt: {len(records)} Datensätze in {len(stats)} Dateien")
+    print(f"  Gesamt: {total} Datensätze in {len(stats)} Dateien")
     return stats
 
 
@@ -446,6 +756,10 @@ def main():
     parser = argparse.ArgumentParser(description="CSV zu XLSX + PDF konvertieren")
     parser.add_argument("-v", "--verbose", action="store_true",
                         help="LaTeX-Logfiles und .tex-Dateien behalten")
+    parser.add_argument("-k", "--kombiniert", action="store_true",
+                        help="Alle Bildungsgänge in ein gemeinsames PDF statt je ein PDF")
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="Alle Dateien neu erzeugen, auch wenn die CSV unverändert ist")
     args = parser.parse_args()
 
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -455,16 +769,58 @@ def main():
         print("Keine CSV-Dateien gefunden.")
         return
 
+    # Fingerprints auch mit --force, damit neu erzeugte Dateien passende Stempel
+    # bekommen; Sammel-PDF und Übersicht hängen von allen CSV-Dateien gemeinsam ab
+    fingerprints = [file_fingerprint(p) for p in csv_files]
+    run_fingerprint = hashlib.blake2b(
+        "".join(fingerprints).encode("ascii"), digest_size=16
+    ).hexdigest()
+
+    # Ist das Sammel-PDF aktuell, brauchen die Worker keine Tex-Teile zu bauen
+    combined_path = os.path.join(script_dir, f"{COMBINED_PDF_NAME}.pdf")
+    combined_current = False
+    if not args.kombiniert:
+        pdf_mode = "einzeln"
+    elif pdf_is_current(combined_path, run_fingerprint, args.verbose, args.force):
+        pdf_mode = None
+        combined_current = True
+    else:
+        pdf_mode = "sammel"
+
     all_stats = []
+    bodies = []
     print(f"{len(csv_files)} CSV-Datei(en) gefunden:\n")
-    for csv_path in csv_files:
-        print(f"Verarbeite: {os.path.basename(csv_path)}")
-        all_stats.extend(process_csv(csv_path, args.verbose))
+    # Ein gemeinsamer Prozess-Pool für alle CSV-Dateien
+    with tempfile.TemporaryDirectory() as work_dir, \
+            ProcessPoolExecutor() as executor:
+        for csv_path, fingerprint in zip(csv_files, fingerprints):
+            print(f"Verarbeite: {os.path.basename(csv_path)}")
+            all_stats.extend(process_csv(csv_path, args.verbose, executor, work_dir, bodies,
+                                         fingerprint, pdf_mode, args.force))
+
+    # Sammel-PDF: ein pdflatex-Lauf für alle Bildungsgänge (ohne Format,
+    # da es nur für dieses eine Dokument gebaut würde)
+    if combined_current:
+        print(f"\n  -> {COMBINED_PDF_NAME}.pdf  (unverändert)")
+    elif bodies:
+        combined_ok = write_tex_document(bodies, combined_path, args.verbose)
+        if combined_ok:
+            write_stamp(combined_path, run_fingerprint)
+            print(f"\n  -> {COMBINED_PDF_NAME}.pdf  ({len(bodies)} Bildungsgänge)")
+        elif combined_ok is None:
+            print(PDFLATEX_MISSING)
 
     if all_stats:
         summary_path = os.path.join(script_dir, "uebersicht.pdf")
-        if write_summary_pdf(all_stats, summary_path, args.verbose):
-            print(f"\n  -> uebersicht.pdf  ({len(all_stats)} Bildungsgänge)")
+        if pdf_is_current(summary_path, run_fingerprint, args.verbose, args.force):
+            print("\n  -> uebersicht.pdf  (unverändert)")
+        else:
+            summary_ok = write_summary_pdf(all_stats, summary_path, args.verbose)
+            if summary_ok:
+                write_stamp(summary_path, run_fingerprint)
+                print(f"\n  -> uebersicht.pdf  ({len(all_stats)} Bildungsgänge)")
+            elif summary_ok is None:
+                print(PDFLATEX_MISSING)
 
     print("\nFertig.")
 